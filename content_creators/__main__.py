@@ -26,6 +26,38 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The skill and agent card are fixed literals, so they are built once at import
+# with model_construct instead of being validated on every startup
+CONTENT_CREATION_SKILL = AgentSkill.model_construct(
+    id='content_creation',
+    name='Content Creation',
+    description=(
+        'Create professional, cross-platform social media content packages. '
+        'Generates unified messaging with platform-specific adaptations and matching images.'
+    ),
+    tags=['content creation', 'social media', 'marketing'],
+    examples=[
+        'Create social media content for our new product launch',
+        'Generate posts for Facebook, Twitter, LinkedIn about our upcoming event',
+        'Make a social media campaign about our sustainability initiatives'
+    ],
+)
+
+AGENT_CARD = AgentCard.model_construct(
+    name='Content Creation Agent',
+    description=(
+        'Generate comprehensive, cross-platform social media content packages. '
+        'This agent creates cohesive messaging adapted for different platforms '
+        'along with matching visuals to ensure brand consistency and engagement.'
+    ),
+    url='http://localhost:10000',
+    version='1.0.0',
+    defaultInputModes=['text', 'text/plain'],
+    defaultOutputModes=['text', 'text/plain', 'image/png', 'application/json'],
+    capabilities=AgentCapabilities.model_construct(streaming=True),
+    skills=[CONTENT_CREATION_SKILL],
+)
+
 @click.command()
 @click.option('--host', 'host', default='0.0.0.0')
 @click.option('--port', 'port', default=10000)
@@ -41,40 +73,8 @@ def main(host, port):
                 f'Missing required API keys: {", ".join(missing_keys)}'
             )
 
-        # Initialize capabilities
-        capabilities = AgentCapabilities(streaming=True)
-        
-        # Define skills
-        content_creation_skill = AgentSkill(
-            id='content_creation',
-            name='Content Creation',
-            description=(
-                'Create professional, cross-platform social media content packages. '
-                'Generates unified messaging with platform-specific adaptations and matching images.'
-            ),
-            tags=['content creation', 'social media', 'marketing'],
-            examples=[
-                'Create social media content for our new product launch',
-                'Generate posts for Facebook, Twitter, LinkedIn about our upcoming event',
-                'Make a social media campaign about our sustainability initiatives'
-            ],
-        )
-        
-        # Initialize agent card
-        agent_card = AgentCard(
-            name='Content Creation Agent',
-            description=(
-                'Generate comprehensive, cross-platform social media content packages. '
-                'This agent creates cohesive messaging adapted for different platforms '
-                'along with matching visuals to ensure brand consistency and engagement.'
-            ),
-            url=os.getenv("PROXY_URL", "http://localhost:10000"),
-            version='1.0.0',
-            defaultInputModes=['text', 'text/plain'],
-            defaultOutputModes=['text', 'text/plain', 'image/png', 'application/json'],
-            capabilities=capabilities,
-            skills=[content_creation_skill],
-        )
+        # Only the URL depends on the environment
+        AGENT_CARD.url = os.getenv("PROXY_URL", "http://localhost:10000")
         
         # Initialize notification sender auth if enabled
         notification_sender_auth = None
@@ -84,24 +84,31 @@ def main(host, port):
             )
         
         # Initialize the agent and task manager
-        content_agent = ContentCreator()
+        content_agent = ContentCreator(
+            mode=os.getenv("CONTENT_CREATION_MODE", "quality")
+        )
         task_manager = ContentTaskManager(
             agent=content_agent,
-            notification_sender_auth=notification_sender_auth
+            notification_sender_auth=notification_sender_auth,
+            embed_images=os.getenv("EMBED_IMAGES", "true").lower() == "true",
+            image_store_dir=os.getenv("IMAGE_STORE_DIR", "output/images"),
+            image_base_url=os.getenv("IMAGE_BASE_URL"),
         )
         
         # Start the server
         server = A2AServer(
-            agent_card=agent_card,
+            agent_card=AGENT_CARD,
             task_manager=task_manager,
             host=host,
             port=port,
         )
         
+        # uvicorn picks up uvloop automatically when it is installed, which it is
+        # on every platform but Windows (see pyproject.toml)
         logger.info(f'Starting Content Creation server on {host}:{port}')
         server.start()
         
-    except MissingAPIKeyError as e:
+    except (MissingAPIKeyError, ValueError) as e:
         logger.error(f'Error: {e}')
         exit(1)
     except Exception as e:
@@ -1,86 +1,321 @@
-from openai import OpenAI
-import json
+import asyncio
+import functools
+import orjson
+from typing import Awaitable, Callable, Dict, Optional
+from crewai import Crew, Process
 from pydantic import BaseModel
-from content_creators.crew import ContentAdapterCrew
+from content_creators.cache import cached_query2inputs
+from content_creators.crew import (
+    VERBOSE,
+    CrewInputs,
+    CrossPlatformTextPackage,
+    build_llm,
+    build_tasks,
+    get_openai_client,
+)
 from content_creators.image_generator import generate_image
+
+# Upper bound on crew tasks running at once, keeps the fan-out under provider rate limits
+MAX_CONCURRENT_TASKS = 8
+
+# Tasks that only depend on the core message, so they can run side by side
+PLATFORM_TASKS = [
+    "x_content_adaptation_task",
+    "facebook_content_adaptation_task",
+    "instagram_content_adaptation_task",
+    "linkedin_content_adaptation_task",
+]
+
+# Tasks each mode runs, each in its own one-task crew
+MODE_TASKS = {
+    "quality": [
+        "core_message_creation_task",
+        "image_prompt_creation_task",
+        *PLATFORM_TASKS,
+        "brand_consistency_review_task",
+        "content_finalization_task",
+    ],
+    "fast": [
+        "core_message_creation_task",
+        "image_prompt_creation_task",
+        "cross_platform_content_task",
+    ],
+}
+
+# Model that turns the user's query into crew inputs
+QUERY2INPUTS_MODEL = "gpt-4o-mini"
+
+# "quality" runs every specialist agent, "fast" writes the whole package in one structured call
+MODES = ("quality", "fast")
+
+# Kept static and above 1024 tokens so OpenAI's automatic prompt caching can reuse it
+# across calls; the per-query user prompt always goes after it.
+SYSTEM_PROMPT = """
+You are a helpful assistant that converts a user's query into a set of inputs for a crew.
+Here is the expected format of the output:
+```json
+{
+    "brand_name": "...",
+    "brand_description": "...",
+    "target_audience": "...",
+    "tone_of_voice": "...",
+    "content_brief": {
+        "topic": "...",
+        "purpose": "...",
+        "key_points": ["..."],
+        "call_to_action": "..."
+    },
+    "brand_colors": {
+        "primary": "...",
+        "secondary": "...",
+        "accent": "...",
+        "background": "...",
+        "text": "..."
+    }
+}
+```
+<INSTRUCTIONS>
+- Convert the user's query into the expected format.
+- The content_brief should be a detailed description of the content to be created.
+- The key_points should be a list of key points that should be included in the content.
+- If no key points are provided, create a list of 3-5 key points.
+- The call_to_action should be a call to action that should be included in the content.
+- If no call to action is provided, create a call to action.
+- if no purpose is provided, create a purpose.
+- if no brand_colors are provided, create a brand_colors.
+- brand_colors values are hex codes. The background and text colors must contrast well.
+- Keep the brand's own wording for names, products and figures; do not invent statistics.
+- Return only the JSON object, without any surrounding text.
+</INSTRUCTIONS>
+
+<EXAMPLES>
+Query:
+Write social media content for the launch of a new AI Process Automation tool.
+You are doing this for TechInnovate, a tech consultancy specializing in AI solutions.
+The target audience is CTOs and Innovation Directors at mid-size enterprises.
+The tone of voice should be professional yet conversational, authoritative but approachable.
+
+Output:
+{
+    "brand_name": "TechInnovate",
+    "brand_description": "A forward-thinking tech consultancy specializing in AI solutions",
+    "target_audience": "CTOs and Innovation Directors at mid-size enterprises",
+    "tone_of_voice": "Professional yet conversational, authoritative but approachable",
+    "content_brief": {
+        "topic": "Launch of our new AI Process Automation tool",
+        "purpose": "Announce the new product launch and drive trial sign-ups",
+        "key_points": [
+            "Automates repetitive manual processes end to end",
+            "Integrates with existing workflow tools",
+            "No coding required for implementation",
+            "Frees teams to focus on higher-value work"
+        ],
+        "call_to_action": "Start your free trial today"
+    },
+    "brand_colors": {
+        "primary": "#0052CC",
+        "secondary": "#00B8D9",
+        "accent": "#36B37E",
+        "background": "#FFFFFF",
+        "text": "#172B4D"
+    }
+}
+
+Query:
+We're Green Leaf Cafe, a neighbourhood coffee shop that sources beans from small organic farms.
+Announce our new autumn menu with pumpkin spice oat lattes and vegan cinnamon rolls.
+Our customers are young professionals and students who care about sustainability. Keep it warm and playful.
+Our colors are forest green (#2E7D32) and cream (#FFF8E1).
+
+Output:
+{
+    "brand_name": "Green Leaf Cafe",
+    "brand_description": "A neighbourhood coffee shop that sources its beans from small organic farms",
+    "target_audience": "Young professionals and students who care about sustainability",
+    "tone_of_voice": "Warm, playful and welcoming",
+    "content_brief": {
+        "topic": "Launch of the new autumn menu",
+        "purpose": "Drive visits to try the seasonal menu",
+        "key_points": [
+            "New pumpkin spice oat latte",
+            "New vegan cinnamon rolls",
+            "Beans sourced from small organic farms",
+            "Available for a limited time this autumn"
+        ],
+        "call_to_action": "Stop by this week and try the autumn menu"
+    },
+    "brand_colors": {
+        "primary": "#2E7D32",
+        "secondary": "#FFF8E1",
+        "accent": "#F57C00",
+        "background": "#FFF8E1",
+        "text": "#1B3A1D"
+    }
+}
+
+Query:
+Create posts for FitTrack's annual step challenge. FitTrack makes a fitness tracking app.
+Key points: the challenge runs for the whole of March, teams of up to 5 people, top teams win charity donations in their name.
+Audience is health-conscious adults aged 25-45. Motivating, energetic tone. Ask people to join via the app.
+
+Output:
+{
+    "brand_name": "FitTrack",
+    "brand_description": "A fitness tracking app that helps people build healthy, active habits",
+    "target_audience": "Health-conscious adults aged 25-45",
+    "tone_of_voice": "Motivating and energetic",
+    "content_brief": {
+        "topic": "FitTrack's annual step challenge",
+        "purpose": "Encourage users to sign up for the step challenge",
+        "key_points": [
+            "The challenge runs for the whole of March",
+            "Compete in teams of up to 5 people",
+            "Top teams win charity donations in their name"
+        ],
+        "call_to_action": "Join the step challenge in the FitTrack app"
+    },
+    "brand_colors": {
+        "primary": "#FF5722",
+        "secondary": "#212121",
+        "accent": "#FFC107",
+        "background": "#FFFFFF",
+        "text": "#212121"
+    }
+}
+</EXAMPLES>
+"""
+
 class ContentCreator:
-    def __init__(self):
-        self.crew = ContentAdapterCrew()
+    def __init__(self, mode: str = "quality"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+        # One LLM for every agent in every invoke
+        self._llm = build_llm()
+        # Same client (and connection pool) the crew's agents use
+        self._openai = get_openai_client()
 
+    @cached_query2inputs(
+        QUERY2INPUTS_MODEL,
+        SYSTEM_PROMPT,
+        orjson.dumps(CrewInputs.model_json_schema()).decode(),
+    )
     def query2inputs(self, query: str):
-        system_prompt = """
-        You are a helpful assistant that converts a user's query into a set of inputs for a crew.
-        Here is the expected format of the output:
-        ```json
-        {
-            "brand_name": "...",
-            "brand_description": "...",
-            "target_audience": "...",
-            "tone_of_voice": "...",
-            "content_brief": {
-                "topic": "...",
-                "purpose": "...",
-                "key_points": ["..."],
-                "call_to_action": "..."
-            },
-            "brand_colors": {
-                "primary": "...",
-                "secondary": "...",
-                "accent": "...",
-                "background": "...",
-                "text": "..."
-            },
-l
-        }
-        ```
-        <INSTRUCTIONS>
-        - Convert the user's query into the expected format.
-        - The content_brief should be a detailed description of the content to be created.
-        - The key_points should be a list of key points that should be included in the content.
-        - If no key points are provided, create a list of 3-5 key points.
-        - The call_to_action should be a call to action that should be included in the content.
-        - If no call to action is provided, create a call to action.
-        - if no purpose is provided, create a purpose.
-        - if no brand_colors are provided, create a brand_colors.
-        </INSTRUCTIONS>
-        """
-
         user_prompt = f"""
         Here is the user's query:
         {query}
         """
-        client = OpenAI()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = self._openai.chat.completions.create(
+            model=QUERY2INPUTS_MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0.7,
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
+        # Decode and validate in one pass, so a malformed response fails here rather than mid-crew
+        return CrewInputs.model_validate_json(
+            response.choices[0].message.content
+        ).model_dump()
 
-    async def invoke(self, query: str):
+    def _build_crews(self) -> Dict[str, Crew]:
+        """Build a one-task crew around each task the current mode runs.
+
+        Crew kickoffs rewrite their tasks' descriptions and outputs in place, so
+        every invoke gets its own tasks and agents instead of sharing them.
+        """
+        tasks = build_tasks(MODE_TASKS[self.mode], self._llm)
+        return {
+            task_name: Crew(
+                agents=[task.agent],
+                tasks=[task],
+                process=Process.sequential,
+                verbose=VERBOSE,
+            )
+            for task_name, task in tasks.items()
+        }
+
+    async def _kickoff(
+        self,
+        task_name: str,
+        crews: Dict[str, Crew],
+        inputs: dict,
+        on_task_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        """Run a single crew task in its own one-task crew."""
+        async with self._semaphore:
+            result = await crews[task_name].kickoff_async(inputs=inputs)
+        if on_task_complete:
+            await on_task_complete(task_name)
+        return result
+
+    async def _generate_image(self, prompt_future: asyncio.Task):
+        """Generate the image as soon as the image prompt task has finished."""
+        image_prompt = (await prompt_future).raw
+        print(f"Found image prompt: {image_prompt[:50]}...")
+        print("Generating image...")
+        image_data = await generate_image(image_prompt)
+        return image_prompt, image_data
+
+    async def invoke(
+        self,
+        query: str,
+        on_task_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        """Create the content package and image for `query`.
+
+        `on_task_complete` is awaited with each crew task's name as soon as
+        that task finishes, so callers can stream progress.
+        """
         print("Converting query to inputs...")
-        inputs = self.query2inputs(query)
+        # Blocking OpenAI call plus the cache's disk I/O, so keep it off the event loop
+        inputs = await asyncio.to_thread(self.query2inputs, query)
 
 
         print(f"Inputs: {inputs}")
         print("Running crew...")
-        result = self.crew.crew().kickoff(inputs=inputs)
-
-        # Parse the raw content from the CrewAI result
-        result_data = result.model_dump()
-        content_data = json.loads(result_data['raw'])
-        
-        # Extract the image prompt
-        image_prompt = content_data['image_prompt']
-        print(f"Found image prompt: {image_prompt[:50]}...")
+        # Building and validating the CrewAI objects is pure-Python work, so keep it off the event loop
+        crews = await asyncio.to_thread(self._build_crews)
+        kickoff = functools.partial(
+            self._kickoff,
+            crews=crews,
+            inputs=inputs,
+            on_task_complete=on_task_complete,
+        )
+        # Core message first, then the image prompt and platform adaptations fan out on top of it
+        await kickoff("core_message_creation_task")
+        prompt_future = asyncio.create_task(kickoff("image_prompt_creation_task"))
+        # The image is generated while the remaining tasks are still running
+        image_future = asyncio.create_task(self._generate_image(prompt_future))
+        platform_futures = []
+        try:
+            if self.mode == "fast":
+                result = await kickoff("cross_platform_content_task")
+            else:
+                platform_futures = [
+                    asyncio.create_task(kickoff(task_name)) for task_name in PLATFORM_TASKS
+                ]
+                await asyncio.gather(*platform_futures)
+                await kickoff("brand_consistency_review_task")
+                await prompt_future
+                result = await kickoff("content_finalization_task")
 
-        # Generate the image
-        print("Generating image...")
-        image_data = generate_image(image_prompt)
+            # Parse and validate the raw content from the CrewAI result in one pass
+            content_data = CrossPlatformTextPackage.model_validate_json(result.raw).model_dump()
+
+            # Report the prompt the image was actually generated from
+            image_prompt, image_data = await image_future
+        except BaseException:
+            # Don't keep paying for an image nobody will receive, stop sibling platform
+            # tasks from reporting progress after the failure, and mark any
+            # already-failed future as retrieved so it isn't logged as unhandled
+            for future in (prompt_future, image_future, *platform_futures):
+                if not future.cancel() and not future.cancelled():
+                    future.exception()
+            raise
+        content_data['image_prompt'] = image_prompt
 
         return content_data, image_data
 
@@ -88,6 +323,7 @@ l
 if __name__ == "__main__":
     import asyncio
     import os
+    from pathlib import Path
     from dotenv import load_dotenv
     from content_creators.image_generator import generate_image
     load_dotenv()
@@ -101,17 +337,23 @@ if __name__ == "__main__":
     The tone of voice should be professional yet conversational, authoritative but approachable.
     """
 
-    crew_result, image_data = asyncio.run(agent.invoke(query))
-    print(crew_result)
+    async def main():
+        crew_result, image_data = await agent.invoke(query)
+        print(crew_result)
 
-    # make output directory
-    os.makedirs("output", exist_ok=True)
+        # make output directory
+        os.makedirs("output", exist_ok=True)
+
+        # Save the image and the full content result to JSON, off the event loop
+        await asyncio.gather(
+            asyncio.to_thread(
+                Path("output/generated_image.png").write_bytes, image_data.bytestring
+            ),
+            asyncio.to_thread(
+                Path("output/content_package.json").write_bytes,
+                orjson.dumps(crew_result, option=orjson.OPT_INDENT_2),
+            ),
+        )
+        print("Content package saved to content_package.json")
 
-    # Save the image to a file
-    with open("output/generated_image.png", "wb") as f:
-        f.write(image_data.bytestring)
-    
-    # Save the full content result to JSON
-    with open("output/content_package.json", "w") as f:
-        json.dump(crew_result, f, indent=2)
-    print("Content package saved to content_package.json")
+    asyncio.run(main())
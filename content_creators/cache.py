@@ -0,0 +1,102 @@
+"""On-disk response cache for the OpenAI and Gemini calls.
+
+Responses are keyed by a blake2b hash of the request text plus whatever the
+response depends on (model, system prompt, schema), so repeated queries and
+image prompts skip the network round-trip entirely, and changing any of those
+dependencies stops old entries from being served.
+"""
+
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import shelve
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", ".cache/responses")
+CACHE_ENABLED = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+# Generated images are several MB each and the cache has no eviction, so they are opt-in
+IMAGE_CACHE_ENABLED = (
+    CACHE_ENABLED and os.getenv("ENABLE_IMAGE_CACHE", "false").lower() == "true"
+)
+
+# shelve does not support concurrent access, so every read and write goes through this lock
+_lock = threading.Lock()
+
+def _key(namespace: str, text: str, salt: str = "") -> str:
+    digest = hashlib.blake2b(
+        f"{salt}\0{text}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return f"{namespace}:{digest}"
+
+def _salt(depends_on) -> str:
+    """Hash everything a cached response depends on besides the request text."""
+    return hashlib.blake2b(
+        "\0".join(depends_on).encode("utf-8"), digest_size=8
+    ).hexdigest()
+
+def _open():
+    os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+    return shelve.open(CACHE_PATH)
+
+def get_cached(namespace: str, text: str, salt: str = ""):
+    """Return the cached response for `text`, or None on a miss."""
+    if not CACHE_ENABLED:
+        return None
+    with _lock, _open() as db:
+        value = db.get(_key(namespace, text, salt))
+    if value is not None:
+        logger.info(f"Cache hit for {namespace}")
+    return value
+
+def set_cached(namespace: str, text: str, value, salt: str = ""):
+    """Store the response for `text`."""
+    if not CACHE_ENABLED:
+        return
+    with _lock, _open() as db:
+        db[_key(namespace, text, salt)] = value
+
+def cached_query2inputs(*depends_on: str):
+    """Cache `ContentCreator.query2inputs` results by query text.
+
+    `depends_on` lists the model, system prompt and schema the result was
+    produced with; they are folded into the key.
+    """
+    salt = _salt(depends_on)
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, query: str):
+            inputs = get_cached("query2inputs", query, salt)
+            if inputs is None:
+                inputs = func(self, query)
+                set_cached("query2inputs", query, inputs, salt)
+            return inputs
+        return wrapper
+    return decorator
+
+def cached_generate_image(*depends_on: str):
+    """Cache successful `generate_image` results by prompt, if ENABLE_IMAGE_CACHE is set.
+
+    `depends_on` lists the model the image was generated with; it is folded
+    into the key.
+    """
+    salt = _salt(depends_on)
+    def decorator(func):
+        if not IMAGE_CACHE_ENABLED:
+            return func
+        @functools.wraps(func)
+        async def wrapper(prompt):
+            # Cached images can be several MB, so keep the disk I/O off the event loop
+            image_data = await asyncio.to_thread(get_cached, "generate_image", prompt, salt)
+            if image_data is None:
+                image_data = await func(prompt)
+                if not image_data.error:
+                    await asyncio.to_thread(
+                        set_cached, "generate_image", prompt, image_data, salt
+                    )
+            return image_data
+        return wrapper
+    return decorator
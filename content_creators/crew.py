@@ -1,13 +1,96 @@
-from typing import List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
+from openai import OpenAI
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+import copy
+import functools
+import httpx
 import os
+import yaml
 from uuid import uuid4
 
 load_dotenv()
 
+# CrewAI's verbose mode prints every agent step, so it is off unless asked for
+VERBOSE = os.getenv("CREW_VERBOSE", "false").lower() == "true"
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    """Return the OpenAI client shared by query2inputs and every crew agent.
+
+    Created lazily so importing this module doesn't require OPENAI_API_KEY.
+    """
+    return OpenAI(
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    )
+
+@functools.lru_cache(maxsize=None)
+def _parse_yaml(config_path: str) -> dict:
+    with open(config_path, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file)
+
+def load_yaml(config_path) -> dict:
+    """Parse a crew config file once per process and return a fresh copy of it.
+
+    CrewBase's map_all_* methods mutate the loaded configs in place, so each
+    caller gets its own deep copy rather than the cached dict.
+    """
+    return copy.deepcopy(_parse_yaml(str(config_path)))
+
+CONFIG_DIR = Path(__file__).parent / "config"
+AGENTS_CONFIG = load_yaml(CONFIG_DIR / "agents.yml")
+TASKS_CONFIG = load_yaml(CONFIG_DIR / "tasks.yml")
+
+def build_llm() -> LLM:
+    """Build the LLM the crew agents run on.
+
+    Passes the shared client through to litellm so concurrent tasks draw from a
+    single connection pool.
+    """
+    return LLM(
+        model="gpt-4o", # Updated to use GPT-4o - adjust based on your access
+        temperature=0.7,
+        client=get_openai_client()
+    )
+
+def build_agent(config: dict, llm: LLM) -> Agent:
+    """Build an agent from its agents.yml entry."""
+    return Agent(
+        config=config,
+        verbose=VERBOSE,
+        memory=False,
+        llm=llm
+    )
+
+class ContentBrief(BaseModel):
+    """Brief for the content to be created"""
+    topic: str = Field(..., description="Topic of the content")
+    purpose: str = Field(..., description="Purpose of the content")
+    key_points: List[str] = Field(..., description="Key points to include")
+    call_to_action: str = Field(..., description="Call to action to include")
+
+class BrandColors(BaseModel):
+    """Brand color palette as hex codes"""
+    primary: str = Field(..., description="Primary brand color")
+    secondary: str = Field(..., description="Secondary brand color")
+    accent: str = Field(..., description="Accent color")
+    background: str = Field(..., description="Background color")
+    text: str = Field(..., description="Text color")
+
+class CrewInputs(BaseModel):
+    """Inputs interpolated into the crew's agent and task configs"""
+    brand_name: str = Field(..., description="Brand name")
+    brand_description: str = Field(..., description="Short description of the brand")
+    target_audience: str = Field(..., description="Audience the content is written for")
+    tone_of_voice: str = Field(..., description="Tone of voice to write in")
+    content_brief: ContentBrief = Field(..., description="Brief for the content to be created")
+    brand_colors: BrandColors = Field(..., description="Brand color palette")
+
 class TextContent(BaseModel):
     """Text content for a specific platform"""
     platform: str = Field(..., description="Platform name")
@@ -24,78 +107,109 @@ class CrossPlatformTextPackage(BaseModel):
     linkedin_content: TextContent = Field(..., description="Content adapted for LinkedIn")
     brand_alignment_notes: str = Field(..., description="Notes on how content aligns with brand guidelines")
 
+# Agent that runs each task and the tasks it takes as context, mirroring the
+# @task methods of ContentAdapterCrew below; keep the two in sync
+TASK_WIRING = {
+    "core_message_creation_task": ("lead_content_creator", []),
+    "image_prompt_creation_task": ("image_prompt_creator", ["core_message_creation_task"]),
+    "x_content_adaptation_task": ("x_content_specialist", ["core_message_creation_task"]),
+    "facebook_content_adaptation_task": ("facebook_content_specialist", ["core_message_creation_task"]),
+    "instagram_content_adaptation_task": ("instagram_content_specialist", ["core_message_creation_task"]),
+    "linkedin_content_adaptation_task": ("linkedin_content_specialist", ["core_message_creation_task"]),
+    "brand_consistency_review_task": ("brand_guidelines_critic", [
+        "core_message_creation_task",
+        "x_content_adaptation_task",
+        "facebook_content_adaptation_task",
+        "instagram_content_adaptation_task",
+        "linkedin_content_adaptation_task",
+    ]),
+    "content_finalization_task": ("lead_content_creator", [
+        "core_message_creation_task",
+        "image_prompt_creation_task",
+        "x_content_adaptation_task",
+        "facebook_content_adaptation_task",
+        "instagram_content_adaptation_task",
+        "linkedin_content_adaptation_task",
+        "brand_consistency_review_task",
+    ]),
+    "cross_platform_content_task": ("lead_content_creator", ["core_message_creation_task"]),
+}
+
+TASK_OUTPUT_JSON = {
+    "content_finalization_task": CrossPlatformTextPackage,
+    "cross_platform_content_task": CrossPlatformTextPackage,
+}
+
+def build_tasks(task_names: Iterable[str], llm: LLM) -> Dict[str, Task]:
+    """Build fresh agents and tasks for `task_names` from the parsed configs.
+
+    Kickoffs mutate their tasks and agents in place, so each run needs its own.
+    ContentAdapterCrew's @agent/@task methods memoize on the instance for the
+    life of the process, so these are built directly instead and can be
+    garbage collected once the run is done.
+    """
+    agents = {}
+    tasks = {}
+
+    def build(task_name: str) -> Task:
+        if task_name not in tasks:
+            agent_name, context = TASK_WIRING[task_name]
+            if agent_name not in agents:
+                agents[agent_name] = build_agent(dict(AGENTS_CONFIG[agent_name]), llm)
+            tasks[task_name] = Task(
+                name=task_name,
+                config=dict(TASKS_CONFIG[task_name]),
+                agent=agents[agent_name],
+                context=[build(context_name) for context_name in context],
+                output_json=TASK_OUTPUT_JSON.get(task_name)
+            )
+        return tasks[task_name]
+
+    for task_name in task_names:
+        build(task_name)
+    return tasks
+
 @CrewBase
 class ContentAdapterCrew():
     """Content Adapter crew for cross-platform social media posts"""
     agents_config = 'config/agents.yml'
     tasks_config = 'config/tasks.yml'
-    llm = LLM(
-        model="gpt-4o", # Updated to use GPT-4o - adjust based on your access
-        temperature=0.7
-    )
+
+    def __init__(self):
+        # One LLM for every agent
+        self.llm = build_llm()
+    
+    def _build_agent(self, name: str) -> Agent:
+        """Build the agent configured under `name` in agents.yml."""
+        return build_agent(self.agents_config[name], self.llm)
     
     @agent
     def lead_content_creator(self) -> Agent:
-        return Agent(
-            config=self.agents_config['lead_content_creator'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('lead_content_creator')
     
     @agent
     def image_prompt_creator(self) -> Agent:
-        return Agent(
-            config=self.agents_config['image_prompt_creator'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('image_prompt_creator')
     
     @agent
     def x_content_specialist(self) -> Agent:
-        return Agent(
-            config=self.agents_config['x_content_specialist'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('x_content_specialist')
     
     @agent
     def facebook_content_specialist(self) -> Agent:
-        return Agent(
-            config=self.agents_config['facebook_content_specialist'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('facebook_content_specialist')
     
     @agent
     def instagram_content_specialist(self) -> Agent:
-        return Agent(
-            config=self.agents_config['instagram_content_specialist'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('instagram_content_specialist')
     
     @agent
     def linkedin_content_specialist(self) -> Agent:
-        return Agent(
-            config=self.agents_config['linkedin_content_specialist'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('linkedin_content_specialist')
     
     @agent
     def brand_guidelines_critic(self) -> Agent:
-        return Agent(
-            config=self.agents_config['brand_guidelines_critic'],
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+        return self._build_agent('brand_guidelines_critic')
     
     @task
     def core_message_creation_task(self) -> Task:
@@ -175,6 +289,19 @@ class ContentAdapterCrew():
             output_json=CrossPlatformTextPackage
         )
     
+    def cross_platform_content_task(self) -> Task:
+        """Single-shot replacement for the platform, review and finalization tasks.
+
+        Not a @task, so it stays out of the sequential crew.
+        """
+        return Task(
+            name='cross_platform_content_task',
+            config=self.tasks_config['cross_platform_content_task'],
+            agent=self.lead_content_creator(),
+            context=[self.core_message_creation_task()],
+            output_json=CrossPlatformTextPackage
+        )
+    
     @crew
     def crew(self) -> Crew:
         """Creates the Content Adapter crew"""
@@ -182,5 +309,9 @@ class ContentAdapterCrew():
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
-        )
\ No newline at end of file
+            verbose=VERBOSE,
+        )
+
+# CrewBase re-reads both YAML files on every instantiation through its load_yaml
+# staticmethod, which lives on the wrapper class, so swap in the parse-once version
+ContentAdapterCrew.load_yaml = staticmethod(load_yaml)
@@ -1,23 +1,33 @@
 import os
 import base64
+import functools
 from google import genai
 from google.genai import types
 from uuid import uuid4
 from dotenv import load_dotenv
 import logging
 from pydantic import BaseModel
+from content_creators.cache import cached_generate_image
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+IMAGE_MODEL = 'gemini-2.0-flash-exp'
+
 class Imagedata(BaseModel):
-    id: str
-    bytestring: bytes
-    mime_type: str
+    id: str | None = None
+    bytestring: bytes = b""
+    mime_type: str | None = None
     error: str | None = None
 
-def generate_image(prompt):
+@functools.lru_cache(maxsize=1)
+def _get_client(api_key: str) -> genai.Client:
+    """Return a Gemini client, reused across calls with the same API key."""
+    return genai.Client(api_key=api_key)
+
+@cached_generate_image(IMAGE_MODEL)
+async def generate_image(prompt):
     """Generate an image based on a text prompt using Gemini."""
     if not prompt:
         return Imagedata(error='Prompt cannot be empty')
@@ -25,24 +35,25 @@ def generate_image(prompt):
     try:
         # Initialize Gemini with API key
         api_key = os.getenv("GOOGLE_API_KEY")
-        logger.info(f"API key: {api_key}")
         if not api_key:
             return Imagedata(error="Google API key not found. Please set the GOOGLE_API_KEY environment variable.")
         
-        client = genai.Client(api_key=api_key)
+        client = _get_client(api_key)
         
         logger.info(f"Generating image with prompt: {prompt}")
         
         # Generate the image
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
+        response = await client.aio.models.generate_content(
+            model=IMAGE_MODEL,
             contents=prompt,
             config=types.GenerateContentConfig(
             response_modalities=['TEXT', 'IMAGE']
             )
         )
 
-        logger.info(f"Response: {response}")
+        # Formatting the whole response would stringify the image payload, so only log its size
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response parts: %d", len(response.candidates[0].content.parts))
 
 
         # Process the response
@@ -51,10 +62,13 @@ def generate_image(prompt):
         # Extract image data
         for part in response.candidates[0].content.parts:
             if hasattr(part, 'inline_data') and part.inline_data is not None:
-                return Imagedata(
+                # The Gemini SDK has already validated these fields, so skip
+                # re-validating (and copying) the image bytes
+                return Imagedata.model_construct(
                     id=image_id,
                     bytestring=part.inline_data.data,
-                    mime_type=part.inline_data.mime_type
+                    mime_type=part.inline_data.mime_type,
+                    error=None
                 )
         
         return Imagedata(error="No image was found in the response")
@@ -65,9 +79,10 @@ def generate_image(prompt):
     
 if __name__ == "__main__":
     from PIL import Image
+    import asyncio
     import io
     prompt = "A children's book drawing of a veterinarian using a stethoscope to listen to the heartbeat of a baby otter."
-    image_data = generate_image(prompt)
+    image_data = asyncio.run(generate_image(prompt))
 
     if not image_data.error:
         image = Image.open(io.BytesIO(image_data.bytestring))
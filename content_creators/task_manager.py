@@ -6,12 +6,15 @@ supporting both text and image content delivery.
 
 import logging
 import asyncio
-import json
+import orjson
 import traceback
 import base64
-from collections import defaultdict
+import functools
+import mimetypes
+from collections import defaultdict, deque
 from collections.abc import AsyncIterable
-from typing import Any, Dict, List, Optional, Union
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from content_creators.crew import ContentAdapterCrew
 from content_creators.image_generator import generate_image
@@ -43,21 +46,68 @@ from common.utils.push_notification_auth import PushNotificationSenderAuth
 
 logger = logging.getLogger(__name__)
 
+# Status messages kept per task; older ones are dropped so long-lived tasks don't grow without bound
+TASK_MESSAGE_HISTORY_CAP = 256
+
+_PLATFORM_CONTENT_KEYS = ('x_content', 'facebook_content', 'instagram_content', 'linkedin_content')
+_EMPTY = {}
+# Intermediate push notifications only carry status, so artifacts (which may hold base64 images) aren't re-dumped
+_STATUS_ONLY_FIELDS = {'id', 'sessionId', 'status'}
+_FINAL_STATES = frozenset({TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED})
+# Fixed status message, built once at import and shared by every streaming task
+_PROGRESS_MSG = Message(
+    role='agent', parts=[TextPart(text='Creating content package and generating image...')]
+)
+
+# Multiple of 3 bytes, so the encoded slices concatenate into the same output
+_B64_CHUNK_SIZE = 3 * 64 * 1024
+
+def _encode_image_b64(image_data) -> str:
+    """Base64-encode the generated image for a FileContent part.
+
+    binascii holds the GIL for the whole of each call, so a single multi-MB
+    encode on a worker thread would still stall the event loop. Encoding in
+    small slices lets the loop thread run in between them.
+    """
+    view = memoryview(image_data.bytestring)
+    return b''.join(
+        base64.b64encode(view[start:start + _B64_CHUNK_SIZE])
+        for start in range(0, len(view), _B64_CHUNK_SIZE)
+    ).decode('ascii')
+
 class ContentTaskManager(InMemoryTaskManager):
     """Content Task Manager, handles content creation tasks and response formatting."""
 
-    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain', 'image/png', 'application/json']
+    SUPPORTED_CONTENT_TYPES = frozenset({'text', 'text/plain', 'image/png', 'application/json'})
 
     def __init__(
         self,
         agent,
         notification_sender_auth: Optional[PushNotificationSenderAuth] = None,
+        embed_images: bool = True,
+        image_store_dir: str = 'output/images',
+        image_base_url: Optional[str] = None,
     ):
+        # A server-local file:// URI is useless to remote clients, so URI mode needs
+        # somewhere the image store is actually served from
+        if not embed_images and not image_base_url:
+            raise ValueError('image_base_url is required when embed_images is off')
         super().__init__()
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        # When embed_images is off, images are written to image_store_dir and the
+        # artifact only carries their URI under image_base_url
+        self.embed_images = embed_images
+        self.image_store_dir = Path(image_store_dir)
+        self.image_base_url = image_base_url
         # Initialize task messages storage
-        self.task_messages = defaultdict(list)
+        self.task_messages = defaultdict(
+            lambda: deque(maxlen=TASK_MESSAGE_HISTORY_CAP)
+        )
+        # Latest background store/notify task per task id; each one waits for the one
+        # before it, so status updates are stored and notified in the order they were sent.
+        # This also keeps a strong reference so they aren't garbage collected mid-flight
+        self._status_chains: Dict[str, asyncio.Task] = {}
 
     def _validate_request(
         self, request: Union[SendTaskRequest, SendTaskStreamingRequest]
@@ -65,9 +115,10 @@ class ContentTaskManager(InMemoryTaskManager):
         """Validate incoming task requests."""
         task_send_params: TaskSendParams = request.params
         
+        # The first argument is the one membership-tested, so pass the frozenset there
         if not utils.are_modalities_compatible(
-            task_send_params.acceptedOutputModes,
             self.SUPPORTED_CONTENT_TYPES,
+            task_send_params.acceptedOutputModes,
         ):
             logger.warning(
                 'Unsupported output mode. Received %s, Support %s',
@@ -99,9 +150,12 @@ class ContentTaskManager(InMemoryTaskManager):
         if validation_error:
             return SendTaskResponse(id=request.id, error=validation_error.error)
 
-        if request.params.pushNotification and self.notification_sender_auth:
+        task_send_params: TaskSendParams = request.params
+        task_id = task_send_params.id
+
+        if task_send_params.pushNotification and self.notification_sender_auth:
             if not await self.set_push_notification_info(
-                request.params.id, request.params.pushNotification
+                task_id, task_send_params.pushNotification
             ):
                 return SendTaskResponse(
                     id=request.id,
@@ -110,15 +164,14 @@ class ContentTaskManager(InMemoryTaskManager):
                     ),
                 )
 
-        await self.upsert_task(request.params)
+        await self.upsert_task(task_send_params)
         task = await self.update_store(
-            request.params.id, TaskStatus(state=TaskState.WORKING), None
+            task_id, TaskStatus(state=TaskState.WORKING), None
         )
         
         if self.notification_sender_auth:
             await self.send_task_notification(task)
 
-        task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
         
         try:
@@ -131,12 +184,12 @@ class ContentTaskManager(InMemoryTaskManager):
             logger.error(f'Error invoking agent: {e}')
             logger.error(traceback.format_exc())
             task = await self.update_store(
-                request.params.id, 
+                task_id, 
                 TaskStatus(
                     state=TaskState.FAILED,  # Using FAILED instead of ERROR
                     message=Message(
                         role='agent', 
-                        parts=[{'type': 'text', 'text': f'Error creating content: {str(e)}'}]
+                        parts=[TextPart(text=f'Error creating content: {str(e)}')]
                     )
                 ), 
                 None
@@ -161,56 +214,19 @@ class ContentTaskManager(InMemoryTaskManager):
         task_id = task_send_params.id
         history_length = task_send_params.historyLength
         
-        # Create artifacts
-        artifacts = []
-        
-        # 1. Add text artifact with JSON content
-        json_content = json.dumps(content_data, indent=2)
-        text_artifact = Artifact(
-            parts=[{'type': 'text', 'text': json_content}],
-            index=0,
-            title="Content Package"
+        text_artifact, image_artifact, summary = await self._build_artifacts(
+            content_data, image_data
         )
-        artifacts.append(text_artifact)
-        
-        # 2. Add image artifact if available
-        if image_data and not image_data.error:
-            image_artifact = Artifact(
-                parts=[
-                    FilePart(
-                        file=FileContent(
-                            bytes=base64.b64encode(image_data.bytestring).decode('utf-8'),
-                            mimeType=image_data.mime_type,
-                            name="generated_image.png"
-                        )
-                    )
-                ],
-                index=1,
-                title="Generated Image"
-            )
+        artifacts = [text_artifact]
+        if image_artifact:
             artifacts.append(image_artifact)
         
-        # Summary message
-        platforms = list(set([
-            content_data.get('x_content', {}).get('platform', ''),
-            content_data.get('facebook_content', {}).get('platform', ''),
-            content_data.get('instagram_content', {}).get('platform', ''),
-            content_data.get('linkedin_content', {}).get('platform', '')
-        ]))
-        platforms = [p for p in platforms if p]
-        
-        summary = f"Created content package with posts for {', '.join(platforms)}."
-        if image_data and not image_data.error:
-            summary += " Generated matching image based on content theme."
-        elif image_data and image_data.error:
-            summary += f" Image generation failed: {image_data.error}"
-        
         # Update task status
         task_status = TaskStatus(
             state=TaskState.COMPLETED,
             message=Message(
                 role='agent', 
-                parts=[{'type': 'text', 'text': summary}]
+                parts=[TextPart(text=summary)]
             )
         )
         
@@ -222,6 +238,74 @@ class ContentTaskManager(InMemoryTaskManager):
             
         return SendTaskResponse(id=request.id, result=task_result)
 
+    async def _build_artifacts(
+        self,
+        content_data: Dict[str, Any],
+        image_data: Any
+    ) -> Tuple[Artifact, Optional[Artifact], str]:
+        """Build the content package and image artifacts and the summary message."""
+        # In URI mode, start writing the image file on a thread so the disk I/O
+        # overlaps with the JSON dump below
+        has_image = image_data and not image_data.error
+        uri_future = None
+        if has_image and not self.embed_images:
+            uri_future = asyncio.create_task(
+                asyncio.to_thread(self._store_image_blob, image_data)
+            )
+
+        json_content = orjson.dumps(content_data, option=orjson.OPT_INDENT_2).decode()
+        text_artifact = Artifact(
+            parts=[TextPart(text=json_content)],
+            index=0,
+            title="Content Package"
+        )
+        
+        image_artifact = None
+        if has_image:
+            if self.embed_images:
+                # Both the encode and the dump above hold the GIL, so this can't overlap
+                # with the dump; the thread just keeps the loop responsive while it runs
+                file_content = FileContent(
+                    bytes=await asyncio.to_thread(_encode_image_b64, image_data),
+                    mimeType=image_data.mime_type,
+                    name="generated_image.png"
+                )
+            else:
+                file_content = FileContent(
+                    uri=await uri_future,
+                    mimeType=image_data.mime_type,
+                    name="generated_image.png"
+                )
+            image_artifact = Artifact(
+                parts=[FilePart(file=file_content)],
+                index=1,
+                title="Generated Image"
+            )
+        
+        # Deduplicate while keeping the package's platform order
+        platforms = []
+        for key in _PLATFORM_CONTENT_KEYS:
+            platform = content_data.get(key, _EMPTY).get('platform')
+            if platform and platform not in platforms:
+                platforms.append(platform)
+        
+        summary = f"Created content package with posts for {', '.join(platforms)}."
+        if image_data and not image_data.error:
+            summary += " Generated matching image based on content theme."
+        elif image_data and image_data.error:
+            summary += f" Image generation failed: {image_data.error}"
+        
+        return text_artifact, image_artifact, summary
+
+    def _store_image_blob(self, image_data) -> str:
+        """Write the generated image to the image store and return its URI."""
+        extension = mimetypes.guess_extension(image_data.mime_type or 'image/png') or '.png'
+        file_name = f'{image_data.id}{extension}'
+        path = self.image_store_dir / file_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(image_data.bytestring)
+        return f"{self.image_base_url.rstrip('/')}/{file_name}"
+
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
     ) -> Union[AsyncIterable[SendTaskStreamingResponse], JSONRPCResponse]:
@@ -231,11 +315,14 @@ class ContentTaskManager(InMemoryTaskManager):
             if error:
                 return error
 
-            await self.upsert_task(request.params)
+            task_send_params: TaskSendParams = request.params
+            task_id = task_send_params.id
+
+            await self.upsert_task(task_send_params)
 
-            if request.params.pushNotification and self.notification_sender_auth:
+            if task_send_params.pushNotification and self.notification_sender_auth:
                 if not await self.set_push_notification_info(
-                    request.params.id, request.params.pushNotification
+                    task_id, task_send_params.pushNotification
                 ):
                     return JSONRPCResponse(
                         id=request.id,
@@ -244,20 +331,16 @@ class ContentTaskManager(InMemoryTaskManager):
                         ),
                     )
 
-            task_send_params: TaskSendParams = request.params
-            sse_event_queue = await self.setup_sse_consumer(
-                task_send_params.id, False
-            )
+            sse_event_queue = await self.setup_sse_consumer(task_id, False)
 
             # Start the streaming task
             asyncio.create_task(self._run_streaming_content_creation(request))
 
             return self.dequeue_events_for_sse(
-                request.id, task_send_params.id, sse_event_queue
+                request.id, task_id, sse_event_queue
             )
-        except Exception as e:
-            logger.error(f'Error in SSE stream: {e}')
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception('SSE stream setup failed')
             return JSONRPCResponse(
                 id=request.id,
                 error=InternalError(
@@ -268,112 +351,40 @@ class ContentTaskManager(InMemoryTaskManager):
     async def _run_streaming_content_creation(self, request: SendTaskStreamingRequest):
         """Run the content creation process with streaming updates."""
         task_send_params: TaskSendParams = request.params
+        task_id = task_send_params.id
         query = self._get_user_query(task_send_params)
 
         try:
-            # Initial status update
-            initial_message = Message(
-                role='agent', 
-                parts=[{'type': 'text', 'text': 'Starting content creation process...'}]
-            )
-            task_status = TaskStatus(state=TaskState.WORKING, message=initial_message)
-            task = await self.update_store(task_send_params.id, task_status, None)
-            
-            if self.notification_sender_auth:
-                await self.send_task_notification(task)
-                
-            task_update_event = TaskStatusUpdateEvent(
-                id=task_send_params.id, status=task_status, final=False
-            )
-            await self.enqueue_events_for_sse(task_send_params.id, task_update_event)
-            
             # Progress update
-            progress_message = Message(
-                role='agent', 
-                parts=[{'type': 'text', 'text': 'Creating content package and generating image...'}]
-            )
-            task_status = TaskStatus(state=TaskState.WORKING, message=progress_message)
-            task = await self.update_store(task_send_params.id, task_status, None)
-            
-            if self.notification_sender_auth:
-                await self.send_task_notification(task)
-                
-            task_update_event = TaskStatusUpdateEvent(
-                id=task_send_params.id, status=task_status, final=False
-            )
-            await self.enqueue_events_for_sse(task_send_params.id, task_update_event)
-            
-            # Invoke the agent (non-streaming)
-            content_data, image_data = await self.agent.invoke(query)
+            task_status = TaskStatus(state=TaskState.WORKING, message=_PROGRESS_MSG)
+            await self._send_status_update(task_id, task_status)
             
-            # Create artifacts
-            artifacts = []
-            
-            # Add JSON text artifact
-            json_content = json.dumps(content_data, indent=2)
-            text_artifact = Artifact(
-                parts=[{'type': 'text', 'text': json_content}],
-                index=0,
-                title="Content Package"
+            # Invoke the agent, streaming a status update as each crew task finishes
+            content_data, image_data = await self.agent.invoke(
+                query,
+                on_task_complete=functools.partial(self._send_task_progress, task_id),
             )
-            artifacts.append(text_artifact)
-            await self.update_store(task_send_params.id, None, [text_artifact])
             
-            task_artifact_update_event = TaskArtifactUpdateEvent(
-                id=task_send_params.id, artifact=text_artifact
+            text_artifact, image_artifact, summary = await self._build_artifacts(
+                content_data, image_data
             )
-            await self.enqueue_events_for_sse(task_send_params.id, task_artifact_update_event)
             
-            # Add image artifact if available
-            if image_data and not image_data.error:
-                image_artifact = Artifact(
-                    parts=[
-                        FilePart(
-                            file=FileContent(
-                                bytes=base64.b64encode(image_data.bytestring).decode('utf-8'),
-                                mimeType=image_data.mime_type,
-                                name="generated_image.png"
-                            )
-                        )
-                    ],
-                    index=1,
-                    title="Generated Image"
-                )
-                artifacts.append(image_artifact)
-                await self.update_store(task_send_params.id, None, [image_artifact])
+            # Add JSON text artifact, then the image artifact if available
+            for artifact in (text_artifact, image_artifact):
+                if artifact is None:
+                    continue
+                await self.update_store(task_id, None, [artifact])
                 
-                task_artifact_update_event = TaskArtifactUpdateEvent(
-                    id=task_send_params.id, artifact=image_artifact
+                # The artifact is already validated, so skip re-validating it in the event
+                task_artifact_update_event = TaskArtifactUpdateEvent.model_construct(
+                    id=task_id, artifact=artifact
                 )
-                await self.enqueue_events_for_sse(task_send_params.id, task_artifact_update_event)
-            
-            # Final message
-            platforms = list(set([
-                content_data.get('x_content', {}).get('platform', ''),
-                content_data.get('facebook_content', {}).get('platform', ''),
-                content_data.get('instagram_content', {}).get('platform', ''),
-                content_data.get('linkedin_content', {}).get('platform', '')
-            ]))
-            platforms = [p for p in platforms if p]
-            
-            summary = f"Created content package with posts for {', '.join(platforms)}."
-            if image_data and not image_data.error:
-                summary += " Generated matching image based on content theme."
-            elif image_data and image_data.error:
-                summary += f" Image generation failed: {image_data.error}"
+                await self.enqueue_events_for_sse(task_id, task_artifact_update_event)
             
             # Completion message
-            final_message = Message(role='agent', parts=[{'type': 'text', 'text': summary}])
+            final_message = Message(role='agent', parts=[TextPart(text=summary)])
             task_status = TaskStatus(state=TaskState.COMPLETED, message=final_message)
-            task = await self.update_store(task_send_params.id, task_status, None)
-            
-            if self.notification_sender_auth:
-                await self.send_task_notification(task)
-                
-            task_update_event = TaskStatusUpdateEvent(
-                id=task_send_params.id, status=task_status, final=True
-            )
-            await self.enqueue_events_for_sse(task_send_params.id, task_update_event)
+            await self._send_status_update(task_id, task_status, final=True)
 
         except Exception as e:
             logger.error(f'An error occurred while streaming the response: {e}')
@@ -381,18 +392,74 @@ class ContentTaskManager(InMemoryTaskManager):
             
             error_message = Message(
                 role='agent', 
-                parts=[{'type': 'text', 'text': f'Error creating content: {str(e)}'}]
+                parts=[TextPart(text=f'Error creating content: {str(e)}')]
             )
-            task_status = TaskStatus(state=TaskState.ERROR, message=error_message)
-            task = await self.update_store(task_send_params.id, task_status, None)
-            
-            if self.notification_sender_auth:
-                await self.send_task_notification(task)
-                
-            task_update_event = TaskStatusUpdateEvent(
-                id=task_send_params.id, status=task_status, final=True
+            task_status = TaskStatus(state=TaskState.FAILED, message=error_message)
+            await self._send_status_update(task_id, task_status, final=True)
+
+    async def _send_task_progress(self, task_id: str, task_name: str):
+        """Send a working status update for a finished crew task."""
+        step = task_name.removesuffix('_task').replace('_', ' ')
+        progress_message = Message(
+            role='agent',
+            parts=[TextPart(text=f'Completed {step}.')]
+        )
+        task_status = TaskStatus(state=TaskState.WORKING, message=progress_message)
+        await self._send_status_update(task_id, task_status)
+
+    async def _send_status_update(
+        self, task_id: str, task_status: TaskStatus, final: bool = False
+    ):
+        """Stream a status update, storing and push-notifying it in the background.
+
+        Final statuses are stored before their event goes out, so a tasks/get
+        right after the final event already sees them.
+        """
+        stored = asyncio.Event()
+        bg_task = asyncio.create_task(
+            self._store_and_notify(
+                task_id, task_status, self._status_chains.get(task_id), stored
             )
-            await self.enqueue_events_for_sse(task_send_params.id, task_update_event)
+        )
+        self._status_chains[task_id] = bg_task
+        bg_task.add_done_callback(functools.partial(self._release_status_chain, task_id))
+
+        # Subscribers read the status from the event itself, so otherwise don't hold it
+        # behind the store write or the notification round-trip
+        if final:
+            await stored.wait()
+        task_update_event = TaskStatusUpdateEvent.model_construct(
+            id=task_id, status=task_status, final=final
+        )
+        await self.enqueue_events_for_sse(task_id, task_update_event)
+
+    async def _store_and_notify(
+        self,
+        task_id: str,
+        task_status: TaskStatus,
+        previous: Optional[asyncio.Task],
+        stored: asyncio.Event,
+    ):
+        """Store a status update and push-notify it once `previous` has finished."""
+        try:
+            if previous:
+                await asyncio.wait((previous,))
+            task = await self.update_store(task_id, task_status, None)
+            stored.set()
+            if self.notification_sender_auth:
+                # Notify with the status being sent, not whatever the shared task holds by then
+                await self.send_task_notification(
+                    task.model_copy(update={'status': task_status})
+                )
+        except Exception:
+            logger.exception(f'Failed to store or notify status for task {task_id}')
+        finally:
+            stored.set()
+
+    def _release_status_chain(self, task_id: str, bg_task: asyncio.Task):
+        """Drop the chain entry once its last background task is done."""
+        if self._status_chains.get(task_id) is bg_task:
+            del self._status_chains[task_id]
 
     async def on_resubscribe_to_task(
         self, request
@@ -434,8 +501,9 @@ class ContentTaskManager(InMemoryTaskManager):
         push_info = await self.get_push_notification_info(task.id)
 
         logger.info(f'Notifying for task {task.id} => {task.status.state}')
+        include = None if task.status.state in _FINAL_STATES else _STATUS_ONLY_FIELDS
         await self.notification_sender_auth.send_push_notification(
-            push_info.url, data=task.model_dump(exclude_none=True)
+            push_info.url, data=task.model_dump(include=include, exclude_none=True)
         )
 
     async def set_push_notification_info(
@@ -463,22 +531,26 @@ class ContentTaskManager(InMemoryTaskManager):
         self, task_id: str, status: Optional[TaskStatus], artifacts: Optional[List[Artifact]]
     ) -> Task:
         """Update the task store with new status and/or artifacts."""
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError as exc:
-                logger.error('Task %s not found for updating the task', task_id)
-                raise ValueError(f'Task {task_id} not found') from exc
-
-            if status:
-                task.status = status
+        # Resolve everything that doesn't need the lock up front to keep the critical section short
+        tasks = self.tasks
+        task_messages = self.task_messages
+        message = status.message if status else None
 
-                if status.message is not None:
-                    self.task_messages[task_id].append(status.message)
-
-            if artifacts:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
-
-            return task
\ No newline at end of file
+        async with self.lock:
+            task = tasks.get(task_id)
+            if task is not None:
+                if status:
+                    task.status = status
+                    if message is not None:
+                        task_messages[task_id].append(message)
+
+                if artifacts:
+                    if task.artifacts is None:
+                        task.artifacts = []
+                    task.artifacts.extend(artifacts)
+
+        if task is None:
+            logger.error('Task %s not found for updating the task', task_id)
+            raise ValueError(f'Task {task_id} not found')
+
+        return task
\ No newline at end of file
@@ -1,11 +1,11 @@
 #!/usr/bin/env python
+import asyncio
 import os
-import json
+import orjson
 from content_creators.crew import ContentAdapterCrew
 from content_creators.image_generator import generate_image
 import time
-import openai
-from pydantic import BaseModel
+from pathlib import Path
 
 def run():
     # Sample inputs from onboarding
@@ -45,14 +45,14 @@ def run():
     
     # Run the crew to generate all content
     print("Starting content generation...")
-    start_time = time.time()
+    start_time = time.perf_counter()
     crew_result = ContentAdapterCrew().crew().kickoff(inputs=inputs)
-    end_time = time.time()
+    end_time = time.perf_counter()
     print(f"Content generation completed in {end_time - start_time:.2f} seconds!")
     
     # Parse the raw content from the CrewAI result
     result_data = crew_result.model_dump()
-    content_data = json.loads(result_data['raw'])
+    content_data = orjson.loads(result_data['raw'])
     
     # Extract the image prompt
     image_prompt = content_data['image_prompt']
@@ -60,30 +60,21 @@ def run():
     
     # Generate the image
     print("Generating image...")
-    image_data = generate_image(image_prompt)
+    image_data = asyncio.run(generate_image(image_prompt))
 
     # make output directory
     os.makedirs("output", exist_ok=True)
 
     # Save the image to a file
-    with open("output/generated_image.png", "wb") as f:
-        f.write(image_data.bytestring)
+    Path("output/generated_image.png").write_bytes(image_data.bytestring)
     
     # Save the full content result to JSON
-    with open("output/content_package.json", "w") as f:
-        json.dump(content_data, f, indent=2)
+    with open("output/content_package.json", "wb") as f:
+        f.write(orjson.dumps(content_data, option=orjson.OPT_INDENT_2))
     print("Content package saved to content_package.json")
     
     return content_data
 
-class Inputs(BaseModel):
-    brand_name: str
-    brand_description: str
-    target_audience: str
-    tone_of_voice: str
-    post_as_company: bool
-    website: str
-
 if __name__ == "__main__":
     # run()
 